@@ -1,51 +1,86 @@
+import asyncio
 import os
 import re
 import sqlite3
+import threading
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, ContextTypes, filters
 from telegram.ext import AIORateLimiter
 
 DB_PATH = "numbers.db"
 NUM_RE = re.compile(r"\b\d{6,}\b")
+NUM_RE_B = re.compile(rb"\b\d{6,}\b")
+INSERT_BATCH = 1_000_000
+
+_CON = sqlite3.connect(DB_PATH, check_same_thread=False)
+_LOCK = threading.Lock()
 
 def db_init():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS numbers (
-            num TEXT PRIMARY KEY
+    with _LOCK:
+        cur = _CON.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS numbers (
+                num TEXT PRIMARY KEY,
+                prefix6 INTEGER
+            )
+        """)
+        cols = [r[1] for r in cur.execute("PRAGMA table_info(numbers)")]
+        if "prefix6" not in cols:
+            cur.execute("ALTER TABLE numbers ADD COLUMN prefix6 INTEGER")
+        cur.execute("DROP INDEX IF EXISTS idx_prefix6")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_prefix6i ON numbers (prefix6)
+        """)
+        # Backfill in Python so older rows holding non-ASCII digits get the
+        # same prefix6 as the insert path (SQLite's CAST would give 0).
+        rows = cur.execute("SELECT num FROM numbers WHERE prefix6 IS NULL").fetchall()
+        cur.executemany(
+            "UPDATE numbers SET prefix6=? WHERE num=?",
+            ((int(n[:6]), n) for (n,) in rows),
         )
-    """)
-    cur.execute("""
-        CREATE INDEX IF NOT EXISTS idx_prefix6 ON numbers (substr(num,1,6))
-    """)
-    con.commit()
-    con.close()
+        _CON.commit()
 
 def db_insert_many(nums):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    inserted = 0
-    for n in nums:
-        try:
-            cur.execute("INSERT INTO numbers(num) VALUES(?)", (n,))
-            inserted += 1
-        except:
-            pass
-    con.commit()
-    con.close()
-    return inserted
+    with _LOCK:
+        before = _CON.total_changes
+        with _CON:
+            _CON.executemany(
+                "INSERT OR IGNORE INTO numbers(num, prefix6) VALUES(?, ?)",
+                ((n, int(n[:6])) for n in nums),
+            )
+        return _CON.total_changes - before
 
 def db_find(prefix6, limit=2000):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute(
-        "SELECT num FROM numbers WHERE substr(num,1,6)=? LIMIT ?",
-        (prefix6, limit),
-    )
-    rows = [r[0] for r in cur.fetchall()]
-    con.close()
-    return rows
+    # prefix6 is compared as an integer, so the same prefix written in
+    # ASCII or Arabic-Indic digits matches rows stored in either script.
+    with _LOCK:
+        cur = _CON.execute(
+            "SELECT num FROM numbers WHERE prefix6=? LIMIT ?",
+            (int(prefix6), limit),
+        )
+        return [r[0] for r in cur.fetchall()]
+
+def scan_numbers(content):
+    # Pure-ASCII files can be scanned as bytes without decoding; anything
+    # else goes through the str pattern so non-ASCII digits still match.
+    if content.isascii():
+        return (m.group().decode("ascii") for m in NUM_RE_B.finditer(content))
+    text = content.decode("utf-8", errors="ignore")
+    return (m.group() for m in NUM_RE.finditer(text))
+
+def ingest(content):
+    inserted = 0
+    batch = {}
+    for n in scan_numbers(content):
+        batch[n] = None
+        if len(batch) >= INSERT_BATCH:
+            inserted += db_insert_many(batch)
+            batch.clear()
+    if batch:
+        inserted += db_insert_many(batch)
+    return inserted
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("ابعت ملف ارقام او اكتب اول 6 ارقام للبحث.")
@@ -53,17 +88,15 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
     file = await update.message.document.get_file()
     content = await file.download_as_bytearray()
-    text = content.decode("utf-8", errors="ignore")
 
-    nums = NUM_RE.findall(text)
-    inserted = db_insert_many(nums)
+    inserted = await asyncio.to_thread(ingest, content)
 
     await update.message.reply_text(f"تم حفظ {inserted} رقم جديد.")
 
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = update.message.text.strip()
-    if text.isdigit() and len(text) == 6:
-        results = db_find(text)
+    if text.isdecimal() and len(text) == 6:
+        results = await asyncio.to_thread(db_find, text)
         if not results:
             await update.message.reply_text("لا يوجد نتائج.")
         else: